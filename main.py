@@ -1,33 +1,109 @@
 from __future__ import annotations
 
 import asyncio
+from bisect import bisect_left, bisect_right
+from contextlib import asynccontextmanager
 from datetime import datetime, timezone
-import json
-import random
-from typing import Dict, Iterable, List, Optional, Sequence
-
+from functools import lru_cache
+from math import ceil, floor, pi, sin
+import os
+import threading
+import traceback
+from typing import AsyncIterator, Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+import orjson
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 from fastapi.responses import HTMLResponse
 from fastapi.staticfiles import StaticFiles
 
-app = FastAPI()
-
 BUILD_ID = "CHORD_FIX_V93"
 
+_ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY
+# Price arrays go over the wire as int32 multiples of 1/PRICE_SCALE (4 decimals)
+PRICE_SCALE = 10000
+# Constant frame fields, serialized once and spliced onto every frame (see
+# _encode_frame); server_path is only served by /build
+_PAYLOAD_STATIC = {
+    "payload_version": "bundle_v2",
+    "build_id": BUILD_ID,
+    "rvol": 1.0,
+}
+_PRICE_FRAME_TAIL = orjson.dumps({"price_scale": PRICE_SCALE})
+_MUSIC_FRAME_TAIL = orjson.dumps({**_PAYLOAD_STATIC, "price_scale": PRICE_SCALE})
+_PRICE_FIELDS = ("qqq_prices", "spy_prices", "qqq_note_prices", "spy_note_prices")
+
+# Simulated price walk per bundle, (QQQ, SPY): noise step (scaled by the noise
+# multiplier), drift amplitude over the trend cycle, and intra-bundle jitter
+_PRICE_STEPS = np.array((0.6, 0.45))
+_PRICE_DRIFTS = np.array((0.05, 0.03))
+_PRICE_JITTER = np.array(((0.08,), (0.06,)))
+# Pitch-class intervals heard as divergence: minor 2nd (1), tritone (6), major 7th (11)
+_DIV_MASK = (1 << 1) | (1 << 6) | (1 << 11)  # 0x842
+# Pitch classes lowered a semitone by _minor_adjust: major 3rd (4), major 6th (9)
+_MINOR_FLAT_MASK = (1 << 4) | (1 << 9)  # 0x210
+# Uniform floats prefetched per refill of InventionEngine._rand_buf
+_RAND_BLOCK = 4096
+# Root-offset walk directions, indexed by a single coin-flip bool
+_ROOT_STEPS = (-1, 1)
+
+
+def _pitch_class_mask(tones: Iterable[int]) -> int:
+    """12-bit mask with bit (tone % 12) set for every tone."""
+    mask = 0
+    for tone in tones:
+        mask |= 1 << (tone % 12)
+    return mask
+
+
+def _nearest_index(sorted_pool: Sequence[int], target: int) -> int:
+    """Index of the pool note nearest to target; ties go to the lower note."""
+    i = bisect_left(sorted_pool, target)
+    if i == 0:
+        return 0
+    if i == len(sorted_pool):
+        return i - 1
+    return i - 1 if target - sorted_pool[i - 1] <= sorted_pool[i] - target else i
+
+
+@lru_cache(maxsize=128)
+def _scale_notes(
+    intervals: Tuple[int, ...], root_midi: int, min_midi: int, max_midi: int
+) -> Tuple[int, ...]:
+    """Ascending scale notes in [min_midi, max_midi]; memoized per scale and range."""
+    intervals_mask = _pitch_class_mask(intervals)
+    return tuple(
+        midi
+        for midi in range(min_midi, max_midi + 1)
+        if (intervals_mask >> ((midi - root_midi) % 12)) & 1
+    )
+
+
+@lru_cache(maxsize=64)
+def _cached_pc_candidates(pitch_class: int, min_midi: int, max_midi: int) -> Tuple[int, ...]:
+    """MIDI notes in [min_midi, max_midi] whose pitch class is pitch_class, ascending."""
+    if not 0 <= pitch_class < 12:
+        return ()
+    first = min_midi + (pitch_class - min_midi) % 12
+    return tuple(range(first, max_midi + 1, 12))
+
+
 class VoiceLeading:
     """Pick the closest chord tone to the previous note."""
 
+    __slots__ = ("root_midi",)
+
     def __init__(self, root_midi: int) -> None:
         self.root_midi = root_midi
 
     def _candidates(
         self, chord_tones: Iterable[int], min_midi: int, max_midi: int
     ) -> List[int]:
-        tones_mod = {tone % 12 for tone in chord_tones}
+        tones_mask = _pitch_class_mask(chord_tones)
         return [
             midi
             for midi in range(min_midi, max_midi + 1)
-            if (midi - self.root_midi) % 12 in tones_mod
+            if (tones_mask >> ((midi - self.root_midi) % 12)) & 1
         ]
 
     def pick(
@@ -51,16 +127,16 @@ class VoiceLeading:
         min_midi: int,
         max_midi: int,
     ) -> int:
-        candidates = [
-            midi
-            for midi in range(min_midi, max_midi + 1)
-            if midi % 12 == pitch_class
-        ]
+        candidates = _cached_pc_candidates(pitch_class, min_midi, max_midi)
         if not candidates:
             return prev_note if prev_note is not None else min_midi
         if prev_note is None:
             return candidates[len(candidates) // 2]
-        return min(candidates, key=lambda note: abs(note - prev_note))
+        # Nearest note of this pitch class is the one at or below prev_note, or
+        # an octave above it (ties go low); clamp to the range's first/last note.
+        below = prev_note - (prev_note - pitch_class) % 12
+        pick = below if prev_note - below <= below + 12 - prev_note else below + 12
+        return min(max(pick, candidates[0]), candidates[-1])
 
     def pick_near_target(
         self,
@@ -70,41 +146,75 @@ class VoiceLeading:
         min_midi: int,
         max_midi: int,
     ) -> int:
-        candidates = [
-            midi
-            for midi in range(min_midi, max_midi + 1)
-            if midi % 12 == pitch_class
-        ]
+        candidates = _cached_pc_candidates(pitch_class, min_midi, max_midi)
         if not candidates:
             return prev_note if prev_note is not None else target_midi
+        # The cost is convex and minimal at target_midi, so the best in-range note
+        # is one of the two pitch-class notes bracketing the target, clamped.
+        first, last = candidates[0], candidates[-1]
+        below = target_midi - (target_midi - pitch_class) % 12
+        low = min(max(below, first), last)
+        high = min(max(below + 12, first), last)
+        if low == high:
+            return low
         if prev_note is None:
-            return min(candidates, key=lambda note: abs(note - target_midi))
-        return min(
-            candidates,
-            key=lambda note: abs(note - target_midi) + 0.5 * abs(note - prev_note),
-        )
+            low_cost = abs(low - target_midi)
+            high_cost = abs(high - target_midi)
+        else:
+            low_cost = abs(low - target_midi) + 0.5 * abs(low - prev_note)
+            high_cost = abs(high - target_midi) + 0.5 * abs(high - prev_note)
+        return high if high_cost < low_cost else low
 
 
 class HarmonicClock:
     """Modulo-16 clock for harmonic progression lookup."""
 
+    __slots__ = ("step", "progression_step")
+
     def __init__(self) -> None:
         self.step = 0
         self.progression_step = 0  # Advances once per bundle for chord progression
 
     def tick(self) -> int:
-        self.step = (self.step + 1) % 16
-        return self.step
+        step = (self.step + 1) & 15
+        self.step = step
+        return step
+
+    def advance(self, steps: int) -> int:
+        """Equivalent to calling tick() `steps` times."""
+        step = (self.step + steps) & 15
+        self.step = step
+        return step
 
     def advance_progression(self) -> int:
         """Advance the chord progression by one step (call once per bundle)."""
-        self.progression_step = (self.progression_step + 1) % 16
-        return self.progression_step
+        progression_step = (self.progression_step + 1) & 15
+        self.progression_step = progression_step
+        return progression_step
 
 
 class InventionEngine:
     """Initial voice-leading and harmonic clock wiring."""
 
+    __slots__ = (
+        "clock", "voice_leading", "prev_soprano", "prev_bass", "rng_np", "_rand_buf",
+        "_rand_pos", "root_offset",
+        "tick_count", "sub_steps", "arpeggio_pattern", "qqq_open", "spy_open",
+        "qqq_price", "spy_price", "base_qqq_step_pct", "base_spy_step_pct",
+        "sensitivity", "qqq_step_pct", "spy_step_pct", "price_noise_multiplier",
+        "progression_presets", "current_progression_key", "chord_progressions",
+        "chord_map_major", "chord_map_minor", "chord_map", "chord_masks",
+        "progression_masks",
+        "allowed_degrees", "max_root_offset", "last_degree", "root_degree_index",
+        "lock_regime", "current_regime", "consecutive_down_bars", "consecutive_up_bars",
+        "prev_bar_price", "regime_switch_threshold", "enable_root_offset_motion",
+        "fixed_root_midi", "soprano_repeat_count", "melody_pattern", "melody_phase",
+        "stuck_limit", "prev_soprano_base", "soprano_rhythm", "bass_rhythm",
+        "bass_sensitivity_multiplier", "trend_cycle_seconds", "prev_spy_direction",
+        "chord_names", "minor_chord_names", "chord_names_by_regime", "_nearest_cache",
+        "debug_enabled",
+    )
+
     SCALES = {
         "MAJOR": [0, 2, 4, 5, 7, 9, 11],
         "MINOR": [0, 2, 3, 5, 7, 8, 10],
@@ -115,7 +225,10 @@ class InventionEngine:
         self.voice_leading = VoiceLeading(root_midi=60)
         self.prev_soprano: Optional[int] = 72
         self.prev_bass: Optional[int] = 48
-        self.rng = random.Random()
+        self.rng_np = np.random.default_rng()
+        # Scalar draws are served from a prefetched block (see _r)
+        self._rand_buf: List[float] = []
+        self._rand_pos = 0
         self.root_offset = 0
         self.tick_count = 0
         self.sub_steps = 16
@@ -130,31 +243,31 @@ class InventionEngine:
         self.qqq_step_pct = self.base_qqq_step_pct
         self.spy_step_pct = self.base_spy_step_pct
         self.price_noise_multiplier = 6.7
-        # Available chord progression presets
+        # Available chord progression presets (packed as bytes: one chord degree per step)
         self.progression_presets = {
             "classical": {
-                "MAJOR": [1, 1, 4, 4, 2, 2, 5, 5, 6, 6, 4, 4, 5, 5, 1, 1],
-                "MINOR": [1, 1, 4, 4, 6, 6, 2, 2, 3, 3, 7, 7, 5, 5, 1, 1],
+                "MAJOR": bytes([1, 1, 4, 4, 2, 2, 5, 5, 6, 6, 4, 4, 5, 5, 1, 1]),
+                "MINOR": bytes([1, 1, 4, 4, 6, 6, 2, 2, 3, 3, 7, 7, 5, 5, 1, 1]),
             },
             "pop": {  # I-V-vi-IV (Axis of Awesome)
-                "MAJOR": [1, 1, 1, 1, 5, 5, 5, 5, 6, 6, 6, 6, 4, 4, 4, 4],
-                "MINOR": [1, 1, 1, 1, 7, 7, 7, 7, 6, 6, 6, 6, 4, 4, 4, 4],
+                "MAJOR": bytes([1, 1, 1, 1, 5, 5, 5, 5, 6, 6, 6, 6, 4, 4, 4, 4]),
+                "MINOR": bytes([1, 1, 1, 1, 7, 7, 7, 7, 6, 6, 6, 6, 4, 4, 4, 4]),
             },
             "blues": {  # 12-bar blues (extended to 16)
-                "MAJOR": [1, 1, 1, 1, 4, 4, 1, 1, 5, 5, 4, 4, 1, 1, 5, 5],
-                "MINOR": [1, 1, 1, 1, 4, 4, 1, 1, 5, 5, 4, 4, 1, 1, 5, 5],
+                "MAJOR": bytes([1, 1, 1, 1, 4, 4, 1, 1, 5, 5, 4, 4, 1, 1, 5, 5]),
+                "MINOR": bytes([1, 1, 1, 1, 4, 4, 1, 1, 5, 5, 4, 4, 1, 1, 5, 5]),
             },
             "jazz": {  # ii-V-I turnarounds
-                "MAJOR": [2, 2, 5, 5, 1, 1, 1, 1, 2, 2, 5, 5, 1, 1, 6, 6],
-                "MINOR": [2, 2, 5, 5, 1, 1, 1, 1, 4, 4, 7, 7, 3, 3, 6, 6],
+                "MAJOR": bytes([2, 2, 5, 5, 1, 1, 1, 1, 2, 2, 5, 5, 1, 1, 6, 6]),
+                "MINOR": bytes([2, 2, 5, 5, 1, 1, 1, 1, 4, 4, 7, 7, 3, 3, 6, 6]),
             },
             "canon": {  # Pachelbel's Canon
-                "MAJOR": [1, 1, 5, 5, 6, 6, 3, 3, 4, 4, 1, 1, 4, 4, 5, 5],
-                "MINOR": [1, 1, 5, 5, 6, 6, 3, 3, 4, 4, 1, 1, 4, 4, 5, 5],
+                "MAJOR": bytes([1, 1, 5, 5, 6, 6, 3, 3, 4, 4, 1, 1, 4, 4, 5, 5]),
+                "MINOR": bytes([1, 1, 5, 5, 6, 6, 3, 3, 4, 4, 1, 1, 4, 4, 5, 5]),
             },
             "fifties": {  # 50s doo-wop (I-vi-IV-V)
-                "MAJOR": [1, 1, 1, 1, 6, 6, 6, 6, 4, 4, 4, 4, 5, 5, 5, 5],
-                "MINOR": [1, 1, 1, 1, 6, 6, 6, 6, 4, 4, 4, 4, 5, 5, 5, 5],
+                "MAJOR": bytes([1, 1, 1, 1, 6, 6, 6, 6, 4, 4, 4, 4, 5, 5, 5, 5]),
+                "MINOR": bytes([1, 1, 1, 1, 6, 6, 6, 6, 4, 4, 4, 4, 5, 5, 5, 5]),
             },
         }
         self.current_progression_key = "classical"
@@ -180,6 +293,13 @@ class InventionEngine:
             7: [10, 14, 17], # VII - major
         }
         self.chord_map = self.chord_map_major  # Default for backward compat
+        # Chord-tone pitch-class masks (relative to root) per regime, indexed by
+        # chord degree 1-7 (slot 0 unused)
+        self.chord_masks = {
+            "MAJOR": (0,) + tuple(_pitch_class_mask(self.chord_map_major[d]) for d in range(1, 8)),
+            "MINOR": (0,) + tuple(_pitch_class_mask(self.chord_map_minor[d]) for d in range(1, 8)),
+        }
+        self.progression_masks = self._progression_masks_for(self.chord_progressions)
         self.allowed_degrees = list(self.chord_map.keys())
         self.max_root_offset = 0
         self.last_degree = 1
@@ -208,6 +328,14 @@ class InventionEngine:
         self.minor_chord_names = {
             1: "i", 2: "ii°", 3: "III", 4: "iv", 5: "V", 6: "VI", 7: "vii°"
         }
+        self.chord_names_by_regime = {
+            "MAJOR": self.chord_names,
+            "MINOR": self.minor_chord_names,
+        }
+        # Nearest-note lookup tables keyed on the (sorted) pool contents
+        self._nearest_cache: Dict[tuple, bytearray] = {}
+        # Per-bundle debug logging; set INVENTION_DEBUG=1 to enable
+        self.debug_enabled = os.environ.get("INVENTION_DEBUG") == "1"
 
     def _current_regime(self) -> str:
         if self.lock_regime:
@@ -246,24 +374,20 @@ class InventionEngine:
         self.prev_bar_price = current_price
 
     def _minor_adjust(self, offsets: Sequence[int]) -> List[int]:
-        adjusted = []
-        for offset in offsets:
-            if offset % 12 in {4, 9}:
-                adjusted.append(offset - 1)
-            else:
-                adjusted.append(offset)
-        return adjusted
+        return [offset - ((_MINOR_FLAT_MASK >> (offset % 12)) & 1) for offset in offsets]
 
     @staticmethod
     def _check_divergence(soprano_note: int, bass_note: int) -> bool:
-        interval = abs(soprano_note - bass_note) % 12
-        return interval in {1, 6, 11}
+        return bool((_DIV_MASK >> (abs(soprano_note - bass_note) % 12)) & 1)
 
-    def _next_price(self, current: float, step: float, drift: float) -> float:
-        noise_step = step * self.price_noise_multiplier
-        noise = self.rng.uniform(-noise_step, noise_step)
-        next_price = current + noise + drift
-        return max(0.01, next_price)
+    def _r(self) -> float:
+        """Next uniform float in [0, 1) from the prefetched block."""
+        pos = self._rand_pos
+        if pos >= len(self._rand_buf):
+            self._rand_buf = self.rng_np.random(_RAND_BLOCK).tolist()
+            pos = 0
+        self._rand_pos = pos + 1
+        return self._rand_buf[pos]
 
     def _price_to_midi(
         self,
@@ -274,16 +398,15 @@ class InventionEngine:
         prev_price: Optional[float] = None,
     ) -> int:
         """Convert price to MIDI with trend-aware rounding to eliminate deadzones."""
-        import math
         delta_pct = (price - open_price) / open_price
         raw_semitones = delta_pct / step_pct
 
         # Use floor/ceil based on price trend direction to be more reactive
         if prev_price is not None:
             if price > prev_price:
-                semitones = math.ceil(raw_semitones)
+                semitones = ceil(raw_semitones)
             elif price < prev_price:
-                semitones = math.floor(raw_semitones)
+                semitones = floor(raw_semitones)
             else:
                 semitones = round(raw_semitones)
         else:
@@ -291,6 +414,20 @@ class InventionEngine:
 
         return base_midi + semitones
 
+    @staticmethod
+    def _prices_to_midi(
+        prices: np.ndarray, open_price: float, base_midi: int, step_pct: float
+    ) -> List[int]:
+        """Vectorized _price_to_midi over a price path, each step trending from the last."""
+        raw_semitones = (prices - open_price) / open_price / step_pct
+        diffs = np.diff(prices, prepend=prices[0])
+        semitones = np.where(
+            diffs > 0,
+            np.ceil(raw_semitones),
+            np.where(diffs < 0, np.floor(raw_semitones), np.round(raw_semitones)),
+        )
+        return (base_midi + semitones.astype(np.int64)).tolist()
+
     def _fit_to_range(self, prev_note: Optional[int], target: int, min_midi: int, max_midi: int) -> int:
         candidates = [target + (12 * shift) for shift in range(-4, 5)]
         candidates = [note for note in candidates if min_midi <= note <= max_midi]
@@ -306,7 +443,7 @@ class InventionEngine:
         scale_degrees = self.SCALES.get(regime, self.SCALES["MAJOR"])
         if not scale_degrees:
             return
-        step = self.rng.choice([-1, 1])
+        step = _ROOT_STEPS[self._r() >= 0.5]
         self.root_degree_index = (self.root_degree_index + step) % len(scale_degrees)
         self.root_offset = scale_degrees[self.root_degree_index]
         self.root_offset = max(-self.max_root_offset, min(self.root_offset, self.max_root_offset))
@@ -339,13 +476,25 @@ class InventionEngine:
     def set_chord_progression(self, key: str) -> None:
         """Set the chord progression preset"""
         if key in self.progression_presets:
+            progressions = self.progression_presets[key]
+            masks = self._progression_masks_for(progressions)
             self.current_progression_key = key
-            self.chord_progressions = self.progression_presets[key]
+            self.chord_progressions = progressions
+            self.progression_masks = masks
             print(f"🎵 Chord progression → {key}")
 
+    def _progression_masks_for(
+        self, progressions: Dict[str, bytes]
+    ) -> Dict[str, Tuple[int, ...]]:
+        """Resolve a progression preset to a chord-tone mask per regime and step."""
+        return {
+            regime: tuple(self.chord_masks[regime][degree] for degree in progression)
+            for regime, progression in progressions.items()
+        }
+
     def _generate_random_opening_price(self, min_price: float, max_price: float) -> float:
         """Generate a random opening price within the given range."""
-        return self.rng.uniform(min_price, max_price)
+        return self.rng_np.uniform(min_price, max_price)
 
     def reset_session(self) -> None:
         """Reset the engine state for a new session with fresh random prices."""
@@ -370,14 +519,14 @@ class InventionEngine:
 
     @staticmethod
     def _offset_scale_degree(
-        note: int, scale_pool: Sequence[int], offset: int
+        note: int, sorted_pool: Sequence[int], offset: int
     ) -> int:
-        if not scale_pool:
+        """Move offset degrees from the pool note nearest to note (pool ascending)."""
+        if not sorted_pool:
             return note
-        pool = sorted(scale_pool)
-        index = min(range(len(pool)), key=lambda i: abs(pool[i] - note))
-        next_index = max(0, min(len(pool) - 1, index + offset))
-        return pool[next_index]
+        index = _nearest_index(sorted_pool, note)
+        next_index = max(0, min(len(sorted_pool) - 1, index + offset))
+        return sorted_pool[next_index]
 
     def _escape_stuck(
         self, note: int, scale_pool: Sequence[int], direction: int
@@ -387,52 +536,70 @@ class InventionEngine:
     def _get_scale_notes(
         self, regime: str, root_midi: int, min_midi: int, max_midi: int
     ) -> List[int]:
+        """
+        Scale notes in [min_midi, max_midi], ascending.
+        The scale-degree helpers rely on this ordering and never re-sort.
+        """
         intervals = self.SCALES.get(regime, self.SCALES["MAJOR"])
-        return [
-            midi
-            for midi in range(min_midi, max_midi + 1)
-            if (midi - root_midi) % 12 in intervals
-        ]
+        return list(_scale_notes(tuple(intervals), root_midi, min_midi, max_midi))
+
+    def _nearest_table(self, scale_pool: Sequence[int]) -> bytearray:
+        """
+        Map every MIDI note 0-127 to the index of its nearest note in a sorted pool.
+        Ties resolve to the lower note, matching min() over an ascending pool.
+        """
+        key = tuple(scale_pool)
+        table = self._nearest_cache.get(key)
+        if table is not None:
+            return table
+        assert list(key) == sorted(key), "scale pools must be sorted ascending"
+        table = bytearray(128)
+        last = len(key) - 1
+        j = 0
+        for midi in range(128):
+            while j < last and key[j + 1] - midi < midi - key[j]:
+                j += 1
+            table[midi] = j
+        self._nearest_cache[key] = table
+        return table
 
     @staticmethod
-    def _nearest_scale_note(target_midi: int, scale_pool: Sequence[int], max_distance: int = 12) -> int:
-        """Find nearest scale note, preferring notes within max_distance semitones."""
-        if not scale_pool:
+    def _nearest_scale_note(target_midi: int, sorted_pool: Sequence[int], max_distance: int = 12) -> int:
+        """
+        Find nearest scale note (pool ascending).
+        max_distance is kept for callers; the nearest note overall is always
+        also the nearest within any window that contains a note.
+        """
+        if not sorted_pool:
             return target_midi
-        # First try to find a note within max_distance
-        nearby = [note for note in scale_pool if abs(note - target_midi) <= max_distance]
-        if nearby:
-            return min(nearby, key=lambda note: abs(note - target_midi))
-        # If no close notes, find the absolute nearest (fallback)
-        return min(scale_pool, key=lambda note: abs(note - target_midi))
+        return sorted_pool[_nearest_index(sorted_pool, target_midi)]
 
     @staticmethod
     def _nearest_scale_note_above(
-        target_midi: int, scale_pool: Sequence[int]
+        target_midi: int, sorted_pool: Sequence[int]
     ) -> Optional[int]:
-        candidates = [note for note in scale_pool if note >= target_midi]
-        if not candidates:
+        index = bisect_left(sorted_pool, target_midi)
+        if index == len(sorted_pool):
             return None
-        return min(candidates, key=lambda note: abs(note - target_midi))
+        return sorted_pool[index]
 
     def _pick_scale_step(
         self,
         prev_note: Optional[int],
         target_midi: int,
-        scale_pool: Sequence[int],
+        sorted_pool: Sequence[int],
         max_degree_step: int,
         repeat_penalty: float = 0.2,
     ) -> int:
-        if not scale_pool:
+        if not sorted_pool:
             return prev_note if prev_note is not None else target_midi
-        pool = sorted(scale_pool)
         if prev_note is None:
-            return min(pool, key=lambda note: abs(note - target_midi))
+            return sorted_pool[_nearest_index(sorted_pool, target_midi)]
 
-        prev_index = min(range(len(pool)), key=lambda i: abs(pool[i] - prev_note))
+        prev_index = _nearest_index(sorted_pool, prev_note)
         lo = max(0, prev_index - max_degree_step)
-        hi = min(len(pool) - 1, prev_index + max_degree_step)
-        window = pool[lo : hi + 1]
+        hi = min(len(sorted_pool) - 1, prev_index + max_degree_step)
+        window = sorted_pool[lo : hi + 1]
         return min(
             window,
             key=lambda note: abs(note - target_midi)
@@ -443,7 +610,7 @@ class InventionEngine:
     def _enforce_stepwise_motion(
         prev_note: Optional[int],
         candidate: int,
-        scale_pool: Sequence[int],
+        sorted_pool: Sequence[int],
         min_move: int = 1,
     ) -> int:
         if prev_note is None or candidate is None:
@@ -451,30 +618,28 @@ class InventionEngine:
         if abs(candidate - prev_note) >= min_move:
             return candidate
         direction = 1 if candidate >= prev_note else -1
-        pool = sorted(scale_pool)
-        if not pool:
+        if not sorted_pool:
             return candidate
         if direction > 0:
-            higher = [note for note in pool if note > prev_note]
-            return higher[0] if higher else candidate
-        lower = [note for note in pool if note < prev_note]
-        return lower[-1] if lower else candidate
+            index = bisect_right(sorted_pool, prev_note)
+            return sorted_pool[index] if index < len(sorted_pool) else candidate
+        index = bisect_left(sorted_pool, prev_note)
+        return sorted_pool[index - 1] if index > 0 else candidate
 
     @staticmethod
     def _step_toward_target(
         prev_note: Optional[int],
         target_midi: int,
-        scale_pool: Sequence[int],
+        sorted_pool: Sequence[int],
         step_degrees: int = 1,
     ) -> Optional[int]:
-        if prev_note is None or not scale_pool:
+        if prev_note is None or not sorted_pool:
             return None
-        pool = sorted(scale_pool)
-        prev_index = min(range(len(pool)), key=lambda i: abs(pool[i] - prev_note))
+        prev_index = _nearest_index(sorted_pool, prev_note)
         direction = 1 if target_midi >= prev_note else -1
         next_index = prev_index + (step_degrees * direction)
-        next_index = max(0, min(len(pool) - 1, next_index))
-        return pool[next_index]
+        next_index = max(0, min(len(sorted_pool) - 1, next_index))
+        return sorted_pool[next_index]
 
     def _avoid_stagnation(
         self,
@@ -516,39 +681,30 @@ class InventionEngine:
         Generate ONLY price data - completely decoupled from music.
         This runs continuously and independently of audio/music generation.
         """
-        start_qqq = self.qqq_price
-        start_spy = self.spy_price
-        
+        # Both tickers advance together: row 0 is QQQ, row 1 is SPY
+        starts = np.array((self.qqq_price, self.spy_price))
+
         # Oscillating drift: cycles between bullish and bearish phases
-        import math
         # Convert cycle duration to angular frequency: 2*pi radians per full cycle
-        cycle_speed = (2 * math.pi) / self.trend_cycle_seconds
-        cycle_position = math.sin(self.tick_count * cycle_speed)  # Oscillation based on cycle setting
-        qqq_drift = 0.05 * cycle_position  # Swings between -0.05 and +0.05
-        spy_drift = 0.03 * cycle_position  # Swings between -0.03 and +0.03
-        
-        end_qqq = self._next_price(start_qqq, step=0.6, drift=qqq_drift)
-        end_spy = self._next_price(start_spy, step=0.45, drift=spy_drift)
-        self.qqq_price = end_qqq
-        self.spy_price = end_spy
-
-        qqq_prices: List[float] = []
-        spy_prices: List[float] = []
-
-        for i in range(self.sub_steps):
-            lerp_factor = i / (self.sub_steps - 1)
-            qqq_price = start_qqq + (end_qqq - start_qqq) * lerp_factor
-            spy_price = start_spy + (end_spy - start_spy) * lerp_factor
-            # Moderate intra-tick price variation for natural movement
-            qqq_price += self.rng.uniform(-0.08, 0.08)
-            spy_price += self.rng.uniform(-0.06, 0.06)
-
-            qqq_prices.append(round(qqq_price, 4))
-            spy_prices.append(round(spy_price, 4))
+        cycle_speed = (2 * pi) / self.trend_cycle_seconds
+        cycle_position = sin(self.tick_count * cycle_speed)  # Oscillation based on cycle setting
+        drifts = _PRICE_DRIFTS * cycle_position
+
+        # Random walk step per ticker, floored at one cent
+        noise_steps = _PRICE_STEPS * self.price_noise_multiplier
+        noise = noise_steps * (2.0 * np.array((self._r(), self._r())) - 1.0)
+        ends = np.maximum(starts + noise + drifts, 0.01)
+        self.qqq_price, self.spy_price = ends.tolist()
+
+        lerp = np.linspace(0.0, 1.0, self.sub_steps)
+        paths = starts[:, None] + (ends - starts)[:, None] * lerp
+        # Moderate intra-tick price variation for natural movement
+        paths += self.rng_np.uniform(-_PRICE_JITTER, _PRICE_JITTER, paths.shape)
+        paths = np.round(paths, 4)
 
         return {
-            "qqq_prices": qqq_prices,
-            "spy_prices": spy_prices,
+            "qqq_prices": paths[0],
+            "spy_prices": paths[1],
             "qqq_current": round(self.qqq_price, 2),
             "spy_current": round(self.spy_price, 2),
         }
@@ -561,50 +717,36 @@ class InventionEngine:
         start_tick = self.tick_count + 1
         
         # Extract price data from input
-        qqq_prices = price_data["qqq_prices"]
-        spy_prices = price_data["spy_prices"]
-        start_qqq = qqq_prices[0]
-        start_spy = spy_prices[0]
-        
+        qqq_prices = np.asarray(price_data["qqq_prices"], dtype=np.float64)
+        spy_prices = np.asarray(price_data["spy_prices"], dtype=np.float64)
+
         # Update regime based on price trend (QQQ as primary indicator)
         end_qqq = qqq_prices[-1]  # Use end of bar price for trend
         self._update_regime_from_price(end_qqq)
         
         regime = self._current_regime()
 
-        if self.clock.step == 0 and self.rng.random() < 0.35:
+        if self.clock.step == 0 and self._r() < 0.35:
             self._advance_root_offset(regime)
 
-        soprano_bundle: List[Optional[int]] = []
-        bass_bundle: List[Optional[int]] = []
-        qqq_note_prices: List[float] = []
-        spy_note_prices: List[Optional[float]] = []
-        divergence_steps: List[bool] = []
+        soprano_bundle = np.empty(self.sub_steps, dtype=np.int16)
+        bass_bundle = np.empty(self.sub_steps, dtype=np.int16)
+        has_bass = np.zeros(self.sub_steps, dtype=np.bool_)
+        divergence = False
 
         self.root_offset = 0
         root_midi = self.fixed_root_midi
         
         # DYNAMIC CHORD PROGRESSION: Advance once per bundle
         # This ensures the chord changes over time, not stuck on one chord
-        self.clock.advance_progression()
-        chord_degree = self.chord_progressions[regime][self.clock.progression_step]
+        progression_step = self.clock.advance_progression()
+        chord_degree = self.chord_progressions[regime][progression_step]
         first_chord_degree = chord_degree  # Store for UI display
         # Debug: print chord progression info every 4 bundles
-        if self.tick_count % 4 == 0:
-            print(f"🎹 Step {self.clock.progression_step}/16 | Chord: {chord_degree} | Preset: {self.current_progression_key}")
-        # Use appropriate chord map based on regime
-        active_chord_map = self.chord_map_minor if regime == "MINOR" else self.chord_map_major
-        chord = active_chord_map[chord_degree]
-        chord_tone_mods = {tone % 12 for tone in chord}
-        # Dynamic range: Calculate initial anchor to center the range around price
-        # This prevents ceiling/floor lock when price drifts from open
-        initial_qqq_anchor = self._price_to_midi(
-            start_qqq, self.qqq_open, base_midi=72, step_pct=self.qqq_step_pct
-        )
-        initial_spy_anchor = self._price_to_midi(
-            start_spy, self.spy_open, base_midi=48, step_pct=self.spy_step_pct
-        )
-
+        if self.debug_enabled and self.tick_count % 4 == 0:
+            print(f"🎹 Step {progression_step}/16 | Chord: {chord_degree} | Preset: {self.current_progression_key}")
+        # Chord-tone mask for this regime and step, resolved when the preset was set
+        chord_mask = self.progression_masks[regime][progression_step]
         # Constrain MIDI to musical range (3 octaves each, comfortable registers)
         # Soprano: C4 (60) to C7 (96) - bright but not piercing
         # Bass: C2 (36) to C5 (72) - deep but audible
@@ -617,172 +759,180 @@ class InventionEngine:
         soprano_pool = self._get_scale_notes(regime, root_midi, soprano_min, soprano_max)
         bass_pool = self._get_scale_notes(regime, root_midi, bass_min, bass_max)
 
-        prev_qqq_price: Optional[float] = None
+        # Chord is fixed for the whole bundle, so its chord-tone pools are too
+        chord_pool_soprano = [
+            note
+            for note in soprano_pool
+            if (chord_mask >> ((note - root_midi) % 12)) & 1
+        ]
+        chord_pool_bass = [
+            note
+            for note in bass_pool
+            if (chord_mask >> ((note - root_midi) % 12)) & 1
+        ]
+        allowed_bass = chord_pool_bass or bass_pool
+
+        # O(1) nearest-note lookups: pool[nearest[clamped_midi]]
+        soprano_nearest = self._nearest_table(soprano_pool)
+        chord_nearest = (
+            self._nearest_table(chord_pool_soprano) if chord_pool_soprano else soprano_nearest
+        )
+        bass_nearest = self._nearest_table(allowed_bass)
+
+        # FIX: Calculate unclamped targets first to maintain responsiveness
+        # This allows tracking price movement even outside the audible MIDI range
+        qqq_anchor_midis = self._prices_to_midi(
+            qqq_prices, self.qqq_open,
+            base_midi=72, step_pct=self.qqq_step_pct,
+        )
+        # Apply bass sensitivity multiplier (bass needs wider moves to jump)
+        bass_step_pct = self.spy_step_pct / self.bass_sensitivity_multiplier
+        spy_anchor_midis = self._prices_to_midi(
+            spy_prices, self.spy_open,
+            base_midi=48, step_pct=bass_step_pct,
+        )
+
+        # Bundle-invariant settings, resolved once instead of on every sub-step
+        sensitivity = self.sensitivity
+        # Rhythm control: Update anchor note at rhythm boundaries
+        rhythm_interval = 16 // self.soprano_rhythm  # 1 for 16th, 2 for 8th, 4 for quarter
+        # bass_rhythm: 4=quarter (every 4), 2=half (every 8), 1=whole (every 16)
+        bass_rhythm_interval = 16 // self.bass_rhythm
+        # HIGH SENSITIVITY: NO variation, pure price tracking
+        # LOW SENSITIVITY: More melodic variation and independence
+        allow_variation = sensitivity < 3.0
+        variation_chance = max(0.0, 0.5 - (sensitivity * 0.08))  # 0.5 at 1x, ~0.0 at 6.25x+
+        # Sensitivity-based distance constraint for the walking bass
+        if sensitivity >= 5.0:
+            bass_max_jump = 4  # Very tight
+        elif sensitivity >= 2.0:
+            bass_max_jump = 8  # Moderate
+        else:
+            bass_max_jump = 12  # Full octave
+        walking_bass = sensitivity < 4.0
+        # Root and fifth of the current chord for the flat-SPY bass pattern
+        chord_bass_root = chord_pool_bass[0] if chord_pool_bass else None
+        chord_bass_fifths = [n for n in chord_pool_bass if (n - root_midi) % 12 == 7]
+
+        # Draw the per-step variation gate and pick for the whole bundle in one call
+        variation_rolls, variation_picks = self.rng_np.random((2, self.sub_steps)).tolist()
+
+        spy_price_list = spy_prices.tolist()
         prev_spy_price: Optional[float] = None
 
-        for i in range(self.sub_steps):
-            self.tick_count += 1
-            self.clock.tick()
+        # Loop-carried state and bound methods live in locals for the sub-step loop
+        # and are written back once it finishes
+        prev_soprano = self.prev_soprano
+        prev_bass = self.prev_bass
+        spy_direction = self.prev_spy_direction
+        nearest_scale_note_above = self._nearest_scale_note_above
 
+        for i in range(self.sub_steps):
             # Use prices from input data (already generated by generate_price_data)
-            qqq_price = qqq_prices[i]
-            spy_price = spy_prices[i]
+            spy_price = spy_price_list[i]
 
             # Chord is now set once per bundle (at the start) for consistent harmonic feel
             # The progression advances between bundles, not within them
 
-            # FIX: Calculate unclamped target first to maintain responsiveness
-            # This allows tracking price movement even outside the audible MIDI range
-            qqq_anchor_midi_raw = self._price_to_midi(
-                qqq_price, self.qqq_open, base_midi=72, step_pct=self.qqq_step_pct,
-                prev_price=prev_qqq_price
-            )
-            prev_qqq_price = qqq_price
-            
-            # Build chord pool based on CURRENT chord (updates every beat)
-            chord_pool = [
-                note
-                for note in soprano_pool
-                if (note - root_midi) % 12 in chord_tone_mods
-            ]
+            qqq_anchor_midi_raw = qqq_anchor_midis[i]
             
             # On chord beats, prefer chord tones
-            if i % 4 == 0:
-                allowed_soprano = chord_pool or soprano_pool
+            if i % 4 == 0 and chord_pool_soprano:
+                allowed_soprano = chord_pool_soprano
+                allowed_soprano_nearest = chord_nearest
             else:
                 allowed_soprano = soprano_pool
-            soprano_degree_step = max(1, min(7, round(self.sensitivity)))
-            
-            # FIX: Sensitivity-based repeat penalty (disable at high sensitivity)
-            repeat_penalty_value = 0.0 if self.sensitivity >= 5.0 else 0.2
+                allowed_soprano_nearest = soprano_nearest
             
-            # Rhythm control: Update anchor note at rhythm boundaries
-            rhythm_interval = 16 // self.soprano_rhythm  # 1 for 16th, 2 for 8th, 4 for quarter
             should_update_soprano = (i % rhythm_interval == 0)
             
             # Soprano generation - STRICT rhythm adherence to prevent overlaps
             # ONLY update at rhythm boundaries, hold between
             if should_update_soprano:
-                # HIGH SENSITIVITY (>=5): Tight tracking within 4 semitones
-                # MED SENSITIVITY (2-5): Moderate tracking within 8 semitones  
-                # LOW SENSITIVITY (<2): Full octave range
-                if self.sensitivity >= 5.0:
-                    max_jump = 4  # Very tight - within a major third
-                elif self.sensitivity >= 2.0:
-                    max_jump = 8  # Moderate - within a major sixth
-                else:
-                    max_jump = 12  # Full octave
-                    
-                base_soprano = self._nearest_scale_note(qqq_anchor_midi_raw, allowed_soprano, max_distance=max_jump)
-                
-                # HIGH SENSITIVITY: NO variation, pure price tracking
-                # LOW SENSITIVITY: More melodic variation and independence
-                variation_chance = max(0.0, 0.5 - (self.sensitivity * 0.08))  # 0.5 at 1x, ~0.0 at 6.25x+
+                base_soprano = allowed_soprano[
+                    allowed_soprano_nearest[max(0, min(127, qqq_anchor_midi_raw))]
+                ]
                 
                 # Add melodic variation ONLY at low sensitivity
-                if self.sensitivity < 3.0 and self.prev_soprano is not None and self.rng.random() < variation_chance:
-                    # Get notes within ±2 scale degrees
-                    nearby_notes = [
-                        self._offset_scale_degree(base_soprano, soprano_pool, offset)
-                        for offset in [-2, -1, 0, 1, 2]
-                    ]
-                    # Remove duplicates and ensure they're in range
-                    nearby_notes = list(set([n for n in nearby_notes if n is not None and soprano_min <= n <= soprano_max]))
+                if allow_variation and prev_soprano is not None and variation_rolls[i] < variation_chance:
+                    # Scale notes within ±2 degrees of the anchor, clamped at the pool
+                    # edges; one slice of the (ascending, in-range) pool
+                    base_index = _nearest_index(soprano_pool, base_soprano)
+                    nearby_notes = soprano_pool[max(0, base_index - 2):base_index + 3]
                     if len(nearby_notes) > 1:
                         # Pick a nearby note for variation
-                        soprano = self.rng.choice(nearby_notes)
+                        soprano = nearby_notes[int(variation_picks[i] * len(nearby_notes))]
                     else:
                         soprano = base_soprano
                 else:
                     # Use price-derived note (pure tracking at high sensitivity)
                     soprano = base_soprano
                 
-                self.prev_soprano = soprano
+                prev_soprano = soprano
             else:
                 # Between rhythm boundaries: hold the previous note
                 # This GUARANTEES no overlaps
-                soprano = self.prev_soprano if self.prev_soprano is not None else 72
+                soprano = prev_soprano if prev_soprano is not None else 72
 
             # BASS LOGIC: Walking bass algorithm responding to SPY price direction
             bass_note: Optional[int] = None
-            bass_note_price: Optional[float] = None
             
-            # Apply bass sensitivity multiplier (bass needs wider moves to jump)
-            bass_step_pct = self.spy_step_pct / self.bass_sensitivity_multiplier
-            spy_anchor_midi = self._price_to_midi(
-                spy_price, self.spy_open, base_midi=48, step_pct=bass_step_pct,
-                prev_price=prev_spy_price
-            )
+            spy_anchor_midi = spy_anchor_midis[i]
             
             # Track SPY price direction for walking bass
             if prev_spy_price is not None:
                 price_delta = spy_price - prev_spy_price
                 if abs(price_delta) < 0.02:  # Flat threshold
-                    self.prev_spy_direction = 0
+                    spy_direction = 0
                 elif price_delta > 0:
-                    self.prev_spy_direction = 1  # Trending up
+                    spy_direction = 1  # Trending up
                 else:
-                    self.prev_spy_direction = -1  # Trending down
+                    spy_direction = -1  # Trending down
             prev_spy_price = spy_price
 
             # Bass generation - rhythm based on bass_rhythm setting
-            # bass_rhythm: 4=quarter (every 4), 2=half (every 8), 1=whole (every 16)
-            bass_rhythm_interval = 16 // self.bass_rhythm
             should_update_bass = (i % bass_rhythm_interval == 0)
             
             if should_update_bass:
-                # Build chord-tone pool for current chord
-                chord_bass_pool = [
-                    note
-                    for note in bass_pool
-                    if (note - root_midi) % 12 in chord_tone_mods
-                ]
-                allowed_bass = chord_bass_pool or bass_pool
-                
-                # Sensitivity-based distance constraint
-                if self.sensitivity >= 5.0:
-                    bass_max_jump = 4  # Very tight
-                elif self.sensitivity >= 2.0:
-                    bass_max_jump = 8  # Moderate
-                else:
-                    bass_max_jump = 12  # Full octave
-                
                 # WALKING BASS ALGORITHM based on SPY direction
-                if self.prev_bass is not None and self.sensitivity < 4.0:
-                    if self.prev_spy_direction > 0:
+                if prev_bass is not None and walking_bass:
+                    if spy_direction > 0:
                         # SPY trending UP: walk up the scale toward next chord tone
-                        candidates = [n for n in allowed_bass if n > self.prev_bass and abs(n - self.prev_bass) <= bass_max_jump]
-                        if candidates:
+                        above = bisect_right(allowed_bass, prev_bass)
+                        if above < len(allowed_bass) and allowed_bass[above] - prev_bass <= bass_max_jump:
                             # Pick the nearest note above
-                            bass_note = min(candidates, key=lambda n: n - self.prev_bass)
+                            bass_note = allowed_bass[above]
                         else:
-                            bass_note = self._nearest_scale_note(spy_anchor_midi, allowed_bass, max_distance=bass_max_jump)
-                    elif self.prev_spy_direction < 0:
+                            bass_note = allowed_bass[bass_nearest[max(0, min(127, spy_anchor_midi))]]
+                    elif spy_direction < 0:
                         # SPY trending DOWN: walk down the scale toward next chord tone
-                        candidates = [n for n in allowed_bass if n < self.prev_bass and abs(n - self.prev_bass) <= bass_max_jump]
-                        if candidates:
+                        below = bisect_left(allowed_bass, prev_bass) - 1
+                        if below >= 0 and prev_bass - allowed_bass[below] <= bass_max_jump:
                             # Pick the nearest note below
-                            bass_note = max(candidates, key=lambda n: n)
+                            bass_note = allowed_bass[below]
                         else:
-                            bass_note = self._nearest_scale_note(spy_anchor_midi, allowed_bass, max_distance=bass_max_jump)
+                            bass_note = allowed_bass[bass_nearest[max(0, min(127, spy_anchor_midi))]]
                     else:
                         # SPY FLAT: alternate between Root and Fifth of the chord
-                        root_note = min(chord_bass_pool) if chord_bass_pool else self.prev_bass
-                        fifth_candidates = [n for n in chord_bass_pool if (n - root_midi) % 12 == 7]
-                        fifth_note = min(fifth_candidates, key=lambda n: abs(n - self.prev_bass)) if fifth_candidates else root_note
+                        root_note = chord_bass_root if chord_bass_root is not None else prev_bass
+                        fifth_note = (
+                            chord_bass_fifths[_nearest_index(chord_bass_fifths, prev_bass)]
+                            if chord_bass_fifths
+                            else root_note
+                        )
                         # Alternate between root and fifth
-                        if self.prev_bass == root_note or abs(self.prev_bass - root_note) <= 2:
+                        if prev_bass == root_note or abs(prev_bass - root_note) <= 2:
                             bass_note = fifth_note
                         else:
                             bass_note = root_note
                 else:
                     # HIGH SENSITIVITY or no previous bass: pure price tracking
-                    bass_note = self._nearest_scale_note(spy_anchor_midi, allowed_bass, max_distance=bass_max_jump)
+                    bass_note = allowed_bass[bass_nearest[max(0, min(127, spy_anchor_midi))]]
                 
-                self.prev_bass = bass_note
+                prev_bass = bass_note
             else:
                 # Between quarter beats: hold the previous note
-                bass_note = self.prev_bass
+                bass_note = prev_bass
 
             # Bass note separation check (prevent soprano and bass from colliding)
 
@@ -790,59 +940,58 @@ class InventionEngine:
                 min_separation = 12
                 min_soprano = bass_note + min_separation
                 if soprano < min_soprano:
-                    adjusted = self._nearest_scale_note_above(min_soprano, soprano_pool)
+                    adjusted = nearest_scale_note_above(min_soprano, soprano_pool)
                     if adjusted is not None:
                         soprano = adjusted
 
-            self.prev_soprano = soprano
-            
-            # Hybrid visual positioning: stay near price but show melodic variation
-            # Add small offset based on MIDI pitch relative to center
-            soprano_center_midi = 72  # Reference center
-            soprano_midi_offset = soprano - soprano_center_midi  # Semitones from center
-            # Scale: 0.3% of price per semitone - keeps notes dancing around price
-            soprano_visual_offset = soprano_midi_offset * (qqq_price * 0.003)
-            qqq_note_price = qqq_price + soprano_visual_offset
-            
-            # Bass visual offset
-            bass_center_midi = 48  # Reference center for bass
-            if bass_note is not None:
-                bass_midi_offset = bass_note - bass_center_midi
-                bass_visual_offset = bass_midi_offset * (spy_price * 0.003)
-                spy_note_price = spy_price + bass_visual_offset
-            else:
-                spy_note_price = None
-
-            soprano_bundle.append(soprano)
-            bass_bundle.append(bass_note)
-            qqq_note_prices.append(round(qqq_note_price, 4))
-            spy_note_prices.append(round(spy_note_price, 4) if spy_note_price is not None else None)
+            prev_soprano = soprano
 
-            if bass_note is None:
-                divergence_steps.append(False)
-            else:
-                divergence_steps.append(self._check_divergence(soprano, bass_note))
+            soprano_bundle[i] = soprano
+            if bass_note is not None:
+                bass_bundle[i] = bass_note
+                has_bass[i] = True
+                if not divergence:
+                    divergence = self._check_divergence(soprano, bass_note)
+
+        self.tick_count += self.sub_steps
+        self.clock.advance(self.sub_steps)
+        self.prev_soprano = prev_soprano
+        self.prev_bass = prev_bass
+        self.prev_spy_direction = spy_direction
+
+        # Hybrid visual positioning: stay near price but show melodic variation
+        # Add small offset based on MIDI pitch relative to center
+        soprano_center_midi = 72  # Reference center
+        bass_center_midi = 48  # Reference center for bass
+        # Scale: 0.3% of price per semitone - keeps notes dancing around price
+        qqq_note_prices = np.round(
+            qqq_prices + (soprano_bundle - soprano_center_midi) * (qqq_prices * 0.003), 4
+        )
+        spy_note_prices = np.round(
+            spy_prices + (bass_bundle - bass_center_midi) * (spy_prices * 0.003), 4
+        )
+        bass_out: object = bass_bundle
+        spy_note_out: object = spy_note_prices
+        if not has_bass.all():
+            # Steps without a bass note serialize as null
+            bass_out = [int(n) if ok else None for n, ok in zip(bass_bundle, has_bass)]
+            spy_note_out = [float(p) if ok else None for p, ok in zip(spy_note_prices, has_bass)]
 
         # Get chord name based on regime (major uses uppercase, minor uses lowercase)
         # Use the FIRST chord of this bundle for consistent UI display
-        if regime == "MINOR":
-            chord_name = self.minor_chord_names.get(first_chord_degree, str(first_chord_degree))
-        else:
-            chord_name = self.chord_names.get(first_chord_degree, str(first_chord_degree))
+        chord_name = self.chord_names_by_regime.get(regime, self.chord_names).get(
+            first_chord_degree, str(first_chord_degree)
+        )
         
         return {
-            "payload_version": "bundle_v2",
-            "server_path": __file__,
-            "build_id": BUILD_ID,
             "soprano_bundle": soprano_bundle,
-            "bass_bundle": bass_bundle,
+            "bass_bundle": bass_out,
             "qqq_prices": qqq_prices,
             "spy_prices": spy_prices,
             "qqq_note_prices": qqq_note_prices,
-            "spy_note_prices": spy_note_prices,
-            "rvol": 1.0,
+            "spy_note_prices": spy_note_out,
             "regime": regime,
-            "divergence": any(divergence_steps),
+            "divergence": divergence,
             "chord": chord_name,
             "root_offset": self.root_offset,
             "start_tick": start_tick,
@@ -863,7 +1012,123 @@ class InventionEngine:
         return {**price_data, **music_data}
 
 
+class BundleBroadcaster:
+    """Generate one payload per interval and fan it out to every subscriber."""
+
+    def __init__(
+        self, make_payload: Callable[[], bytes], interval: float = 1.0, queue_size: int = 4
+    ) -> None:
+        self.make_payload = make_payload
+        self.interval = interval
+        self.queue_size = queue_size
+        self.subscribers: Set[asyncio.Queue] = set()
+
+    def subscribe(self) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self.subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        self.subscribers.discard(queue)
+
+    def publish(self, payload: bytes) -> None:
+        for queue in self.subscribers:
+            if queue.full():
+                # Slow client: drop its oldest payload rather than stall the feed
+                queue.get_nowait()
+            queue.put_nowait(payload)
+
+    async def run(self) -> None:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time()
+        while True:
+            # Only advance the engine while someone is listening
+            if self.subscribers:
+                try:
+                    # Generate + serialize off the event loop so sockets keep being serviced
+                    self.publish(await asyncio.to_thread(self.make_payload))
+                except Exception:
+                    # One bad bundle must not end the feed; skip it and retry next tick
+                    print("⚠️ Bundle generation failed, skipping this tick")
+                    traceback.print_exc()
+            # Sleep to a fixed deadline so generation time doesn't stretch the interval
+            deadline += self.interval
+            delay = deadline - loop.time()
+            if delay < 0:
+                # Behind schedule: restart the cadence from now instead of bursting
+                deadline -= delay
+                delay = 0.0
+            await asyncio.sleep(delay)
+
+
 engine = InventionEngine()
+# The producers generate in worker threads while routes and websocket connects
+# mutate the engine on the event loop; every engine access takes this lock.
+# Hold times are well under a millisecond, so loop-side callers take it inline.
+_engine_lock = threading.Lock()
+
+
+def _scale_prices(data: Dict[str, object]) -> Dict[str, object]:
+    """Replace float price arrays with scaled integers; clients divide by price_scale."""
+    scaled = dict(data)
+    for field in _PRICE_FIELDS:
+        values = data.get(field)
+        if isinstance(values, np.ndarray):
+            scaled[field] = np.rint(values * PRICE_SCALE).astype(np.int32)
+        elif isinstance(values, list):
+            scaled[field] = [None if v is None else round(v * PRICE_SCALE) for v in values]
+    return scaled
+
+
+def _encode_frame(data: Dict[str, object], static_tail: bytes) -> bytes:
+    """Serialize the per-bundle fields and splice in a pre-serialized static object."""
+    body = orjson.dumps(_scale_prices(data), option=_ORJSON_OPTIONS)
+    return body[:-1] + b"," + static_tail[1:]
+
+
+def _make_price_payload() -> bytes:
+    with _engine_lock:
+        data = engine.generate_price_data()
+    return _encode_frame(data, _PRICE_FRAME_TAIL)
+
+
+def _make_music_payload() -> bytes:
+    with _engine_lock:
+        data = engine.generate_complete_bundle()
+    return _encode_frame(data, _MUSIC_FRAME_TAIL)
+
+
+price_stream = BundleBroadcaster(_make_price_payload)
+music_stream = BundleBroadcaster(_make_music_payload)
+
+
+def _report_stream_exit(task: asyncio.Task) -> None:
+    """Surface a producer that stopped for any reason other than shutdown."""
+    if task.cancelled():
+        return
+    exc = task.exception()
+    if exc is not None:
+        print(f"❌ Stream producer stopped: {exc!r}")
+        traceback.print_exception(type(exc), exc, exc.__traceback__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """Run one producer task per stream for the lifetime of the app."""
+    stream_tasks: List[asyncio.Task] = []
+    for stream in (price_stream, music_stream):
+        task = asyncio.create_task(stream.run())
+        task.add_done_callback(_report_stream_exit)
+        stream_tasks.append(task)
+    try:
+        yield
+    finally:
+        for task in stream_tasks:
+            task.cancel()
+        await asyncio.gather(*stream_tasks, return_exceptions=True)
+
+
+app = FastAPI(lifespan=lifespan)
 
 
 @app.get("/hello", response_class=HTMLResponse)
@@ -882,42 +1147,44 @@ async def build_info() -> Dict[str, str]:
 
 @app.post("/config")
 async def update_config(payload: Dict[str, object]) -> Dict[str, object]:
-    multiplier = float(payload.get("sensitivity", 1.0))
-    engine.set_sensitivity(multiplier)
-    noise = float(payload.get("price_noise", engine.price_noise_multiplier))
-    engine.set_price_noise(noise)
-    if "soprano_rhythm" in payload:
-        rhythm = int(payload["soprano_rhythm"])
-        engine.set_soprano_rhythm(rhythm)
-    if "bass_rhythm" in payload:
-        rhythm = int(payload["bass_rhythm"])
-        engine.set_bass_rhythm(rhythm)
-    if "trend_cycle" in payload:
-        seconds = int(payload["trend_cycle"])
-        engine.set_trend_cycle(seconds)
-    if "chord_progression" in payload:
-        engine.set_chord_progression(payload["chord_progression"])
-    return {
-        "sensitivity": engine.sensitivity,
-        "qqq_step_pct": engine.qqq_step_pct,
-        "spy_step_pct": engine.spy_step_pct,
-        "price_noise": engine.price_noise_multiplier,
-        "soprano_rhythm": engine.soprano_rhythm,
-        "bass_rhythm": engine.bass_rhythm,
-        "trend_cycle": engine.trend_cycle_seconds,
-        "chord_progression": engine.current_progression_key,
-    }
+    with _engine_lock:
+        multiplier = float(payload.get("sensitivity", 1.0))
+        engine.set_sensitivity(multiplier)
+        noise = float(payload.get("price_noise", engine.price_noise_multiplier))
+        engine.set_price_noise(noise)
+        if "soprano_rhythm" in payload:
+            rhythm = int(payload["soprano_rhythm"])
+            engine.set_soprano_rhythm(rhythm)
+        if "bass_rhythm" in payload:
+            rhythm = int(payload["bass_rhythm"])
+            engine.set_bass_rhythm(rhythm)
+        if "trend_cycle" in payload:
+            seconds = int(payload["trend_cycle"])
+            engine.set_trend_cycle(seconds)
+        if "chord_progression" in payload:
+            engine.set_chord_progression(payload["chord_progression"])
+        return {
+            "sensitivity": engine.sensitivity,
+            "qqq_step_pct": engine.qqq_step_pct,
+            "spy_step_pct": engine.spy_step_pct,
+            "price_noise": engine.price_noise_multiplier,
+            "soprano_rhythm": engine.soprano_rhythm,
+            "bass_rhythm": engine.bass_rhythm,
+            "trend_cycle": engine.trend_cycle_seconds,
+            "chord_progression": engine.current_progression_key,
+        }
 
 
 @app.post("/reset")
 async def reset_session() -> Dict[str, object]:
     """Reset engine state with fresh random prices."""
-    engine.reset_session()
-    return {
-        "status": "reset",
-        "qqq_open": round(engine.qqq_open, 2),
-        "spy_open": round(engine.spy_open, 2),
-    }
+    with _engine_lock:
+        engine.reset_session()
+        return {
+            "status": "reset",
+            "qqq_open": round(engine.qqq_open, 2),
+            "spy_open": round(engine.spy_open, 2),
+        }
 
 
 @app.websocket("/ws/prices")
@@ -928,14 +1195,15 @@ async def prices_websocket(websocket: WebSocket) -> None:
     """
     await websocket.accept()
     print("📊 Price stream connected")
+    queue = price_stream.subscribe()
     try:
         while True:
-            price_data = engine.generate_price_data()
-            await websocket.send_text(json.dumps(price_data))
-            await asyncio.sleep(1.0)
+            await websocket.send_bytes(await queue.get())
     except WebSocketDisconnect:
         print("📊 Price stream disconnected")
         return
+    finally:
+        price_stream.unsubscribe(queue)
 
 
 @app.websocket("/ws/music")
@@ -946,18 +1214,17 @@ async def music_websocket(websocket: WebSocket) -> None:
     """
     await websocket.accept()
     print("🎵 Music stream connected - resetting session...")
-    engine.reset_session()
+    with _engine_lock:
+        engine.reset_session()
+    queue = music_stream.subscribe()
     try:
         while True:
-            # Generate price data first, then music from that data
-            price_data = engine.generate_price_data()
-            music_data = engine.generate_music_from_prices(price_data)
-            complete_data = {**price_data, **music_data}
-            await websocket.send_text(json.dumps(complete_data))
-            await asyncio.sleep(1.0)
+            await websocket.send_bytes(await queue.get())
     except WebSocketDisconnect:
         print("🎵 Music stream disconnected")
         return
+    finally:
+        music_stream.unsubscribe(queue)
 
 
 @app.websocket("/ws")
@@ -968,15 +1235,25 @@ async def legacy_websocket(websocket: WebSocket) -> None:
     """
     await websocket.accept()
     print("🔌 Legacy WebSocket connection - resetting session...")
-    engine.reset_session()
+    with _engine_lock:
+        engine.reset_session()
+    queue = music_stream.subscribe()
     try:
         while True:
-            data = engine.generate_complete_bundle()
-            await websocket.send_text(json.dumps(data))
-            await asyncio.sleep(1.0)
+            await websocket.send_bytes(await queue.get())
     except WebSocketDisconnect:
         print("🔌 Legacy WebSocket disconnected")
         return
+    finally:
+        music_stream.unsubscribe(queue)
 
 
 app.mount("/", StaticFiles(directory="static", html=True), name="static")
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    # Equivalent to: uvicorn main:app --loop uvloop --ws websockets
+    # ("auto" falls back to asyncio where uvloop is unavailable, e.g. Windows)
+    uvicorn.run(app, host="127.0.0.1", port=8000, loop="auto", ws="websockets")
@@ -20,6 +20,26 @@ import { logLine, updateStatus, elements } from './ui.js';
 import { addVisualBundle, addAnchor, formatRootOffset } from './visualizer.js';
 import { handleLegacyTick } from './legacyHandler.js';
 
+// The server sends JSON as binary frames; decode them back to text before parsing
+const textDecoder = new TextDecoder();
+const parseMessage = (data) =>
+  descalePrices(JSON.parse(typeof data === "string" ? data : textDecoder.decode(data)));
+
+// Price arrays arrive as integers scaled by price_scale (10000 = 4 decimals)
+const PRICE_ARRAY_FIELDS = ["qqq_prices", "spy_prices", "qqq_note_prices", "spy_note_prices"];
+const descalePrices = (data) => {
+  const scale = data?.price_scale;
+  if (!scale) {
+    return data;
+  }
+  for (const field of PRICE_ARRAY_FIELDS) {
+    if (Array.isArray(data[field])) {
+      data[field] = data[field].map((value) => (value == null ? value : value / scale));
+    }
+  }
+  return data;
+};
+
 export const setConfig = async (sensitivityValue, priceNoiseValue, sopranoRhythmValue, bassRhythmValue, trendCycleValue, chordProgressionValue) => {
   const { sensitivityValueEl, priceNoiseValueEl } = elements;
   
@@ -66,6 +86,7 @@ export const connectPriceSocket = () => {
 
   const protocol = window.location.protocol === "https:" ? "wss" : "ws";
   const socket = new WebSocket(`${protocol}://${window.location.host}/ws/prices`);
+  socket.binaryType = "arraybuffer";
   setPriceSocket(socket);
 
   socket.addEventListener("open", () => {
@@ -79,7 +100,7 @@ export const connectPriceSocket = () => {
   });
 
   socket.addEventListener("message", (event) => {
-    const data = JSON.parse(event.data);
+    const data = parseMessage(event.data);
     const { qqq_prices, spy_prices, qqq_current, spy_current } = data;
 
     const { qqqPriceEl, spyPriceEl } = elements;
@@ -111,6 +132,7 @@ export const connectMusicSocket = (toggleQqq, toggleSpy, sopranoRhythmSelect) =>
 
   const protocol = window.location.protocol === "https:" ? "wss" : "ws";
   const socket = new WebSocket(`${protocol}://${window.location.host}/ws/music`);
+  socket.binaryType = "arraybuffer";
   setMusicSocket(socket);
 
   socket.addEventListener("open", () => {
@@ -123,7 +145,7 @@ export const connectMusicSocket = (toggleQqq, toggleSpy, sopranoRhythmSelect) =>
   });
 
   socket.addEventListener("message", (event) => {
-    const data = JSON.parse(event.data);
+    const data = parseMessage(event.data);
     const {
       soprano_midi,
       bass_midi,